@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
 import hashlib
 import random
 
@@ -13,14 +14,19 @@ threshold = 3  # Minimum signatures required
 
 # Simulate VRF using hash function for committee selection
 def vrf_select_committee(guards, seed, committee_size):
-    hashed_guards = []
+    digests = []
     for guard in guards:
         combined = (guard + seed).encode('utf-8')
-        hash_digest = hashlib.sha256(combined).hexdigest()
-        hashed_guards.append((guard, hash_digest))
-    # Sort based on hash to simulate randomness
-    sorted_guards = sorted(hashed_guards, key=lambda x: x[1])
-    committee = [guard for guard, _ in sorted_guards[:committee_size]]
+        digests.append(hashlib.sha256(combined).digest())
+    # Read each digest's first 8 bytes as a big-endian integer so they order like the raw bytes
+    keys = np.frombuffer(b''.join(d[:8] for d in digests), dtype='>u8')
+    # Partial-select the lowest hashes, then order just those
+    if committee_size < len(keys):
+        selected = np.argpartition(keys, committee_size - 1)[:committee_size]
+    else:
+        selected = np.arange(len(keys))
+    selected = selected[np.argsort(keys[selected])]
+    committee = [guards[i] for i in selected]
     return committee
 
 # Simulate transaction verification process
@@ -1,31 +1,40 @@
-import uuid
+import itertools
+import sys
 from datatypes import Event
 
+# Legitimate events get non-negative integer IDs; fabricated ones are negative.
+next_event_id = itertools.count()
+
 class SimpleBlockchain:
     """A simplified representation of a blockchain holding actual events."""
+    __slots__ = ("chain_id", "events", "event_log")
+
     def __init__(self, chain_id):
-        self.chain_id = chain_id
+        self.chain_id = sys.intern(chain_id)  # Reused as a dict key on every step
         self.events = {}  # event_id -> Event
+        self.event_log = []  # Events in insertion order, for cursor-based scans
         # print(f"Blockchain '{self.chain_id}' initialized.")
 
     def add_event(self, target_chain_id, data):
         """Adds a new legitimate event to this blockchain."""
-        event_id = str(uuid.uuid4())
+        event_id = next(next_event_id)
         new_event = Event(
             event_id=event_id,
             source_chain_id=self.chain_id,
             target_chain_id=target_chain_id,
             data=data,
-            is_valid=True
+            is_valid=True,
+            amount=data.get("amount", 0)
         )
         self.events[event_id] = new_event
-        # print(f"[Blockchain:{self.chain_id}] Added valid event {event_id[:8]} for target {target_chain_id}")
+        self.event_log.append(new_event)
+        # print(f"[Blockchain:{self.chain_id}] Added valid event {event_id} for target {target_chain_id}")
         return new_event
 
     def get_event(self, event_id):
         """Retrieve an event by its ID."""
         return self.events.get(event_id)
 
-    def get_all_event_ids(self):
-        """Return all valid event IDs on this chain."""
-        return list(self.events.keys())
\ No newline at end of file
+    def events_since(self, index):
+        """Return events added after the first `index` events, in insertion order."""
+        return self.event_log[index:]
\ No newline at end of file
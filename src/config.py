@@ -3,6 +3,7 @@ NUM_GUARDS = 5
 WATCHER_MALICIOUS_RATIO = 0.3  # 30% of watchers might be malicious
 GUARD_MALICIOUS_RATIO = 0.3    # 30% of guards might be malicious
 GUARD_THRESHOLD_RATIO = 0.6  # 60% of Guards must verify for an event to pass
+GUARD_VERIFY_WORKERS = 1     # Threads verifying reported events in parallel (1 = no thread pool)
 
 NUM_SIMULATION_STEPS = 10
 EVENTS_PER_STEP = 3
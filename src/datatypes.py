@@ -1,4 +1,23 @@
-from collections import namedtuple
+from dataclasses import dataclass
 
-Event = namedtuple("Event", ["event_id", "source_chain_id", "target_chain_id", "data", "is_valid"])
-ReportedEvent = namedtuple("ReportedEvent", ["event_id", "source_chain_id", "target_chain_id", "data", "reporter_id"])
\ No newline at end of file
+
+@dataclass(slots=True)
+class Event:
+    """An event recorded on a source chain."""
+    event_id: int
+    source_chain_id: str
+    target_chain_id: str
+    data: dict
+    is_valid: bool
+    amount: int = 0  # Copy of data["amount"], read without a dict lookup
+
+
+@dataclass(slots=True)
+class ReportedEvent:
+    """An event as reported by a Watcher."""
+    event_id: int
+    source_chain_id: str
+    target_chain_id: str
+    data: dict
+    reporter_id: str
+    amount: int = 0  # Copy of data["amount"], read without a dict lookup
@@ -1,15 +1,21 @@
 import random
-import uuid
+import itertools
+import sys
 from datatypes import ReportedEvent
 from blockchain import SimpleBlockchain
 
+# Fabricated event IDs are negative so they never collide with real ones.
+next_fake_id = itertools.count(1)
+
 class Watcher:
     """Monitors a blockchain and reports events."""
+    __slots__ = ("watcher_id", "monitored_chain", "is_malicious", "cursor", "type")
+
     def __init__(self, watcher_id, monitored_chain: SimpleBlockchain, is_malicious=False):
-        self.watcher_id = watcher_id
+        self.watcher_id = sys.intern(watcher_id)
         self.monitored_chain = monitored_chain
         self.is_malicious = is_malicious
-        self.seen_event_ids = set()
+        self.cursor = 0  # Index into monitored_chain.event_log of the next unseen event
         self.type = "Malicious" if is_malicious else "Honest"
         # print(f"  Watcher {self.watcher_id} ({self.type}) initialized monitoring {monitored_chain.chain_id}.")
 
@@ -21,75 +27,69 @@ class Watcher:
         reports = []
         # --- Honest Behavior ---
         if not self.is_malicious:
-            all_event_ids = self.monitored_chain.get_all_event_ids()
-            new_event_ids = set(all_event_ids) - self.seen_event_ids
-            for event_id in new_event_ids:
-                event = self.monitored_chain.get_event(event_id)
-                if event:
-                    report = ReportedEvent(
-                        event_id=event.event_id,
-                        source_chain_id=event.source_chain_id,
-                        target_chain_id=event.target_chain_id,
-                        data=event.data,
-                        reporter_id=self.watcher_id
-                    )
-                    reports.append(report)
-                    self.seen_event_ids.add(event_id)
-                    # print(f"  Watcher {self.watcher_id} (Honest): Reported valid event {event_id[:8]}")
+            new_events = self.monitored_chain.events_since(self.cursor)
+            self.cursor += len(new_events)
+            for event in new_events:
+                report = ReportedEvent(
+                    event_id=event.event_id,
+                    source_chain_id=event.source_chain_id,
+                    target_chain_id=event.target_chain_id,
+                    data=event.data,
+                    reporter_id=self.watcher_id,
+                    amount=event.amount
+                )
+                reports.append(report)
+                # print(f"  Watcher {self.watcher_id} (Honest): Reported valid event {event.event_id}")
 
         # --- Malicious Behavior (Fabricate one event per step with value) ---
         else:
-            fake_event_id = f"fake-{str(uuid.uuid4())}"
+            fake_event_id = -next(next_fake_id)
+            fake_amount = random.randint(500, 5000)
             fake_report = ReportedEvent(
                 event_id=fake_event_id,
                 source_chain_id=self.monitored_chain.chain_id, # Pretend it's from monitored chain
                 target_chain_id="target-chain-malicious",
-                data={"amount": random.randint(500, 5000), "recipient": "attacker_addr"},
-                reporter_id=self.watcher_id
+                data={"amount": fake_amount, "recipient": "attacker_addr"},
+                reporter_id=self.watcher_id,
+                amount=fake_amount
             )
             reports.append(fake_report)
-            # print(f"  Watcher {self.watcher_id} (Malicious): Fabricated event {fake_event_id[:8]}")
+            # print(f"  Watcher {self.watcher_id} (Malicious): Fabricated event {fake_event_id}")
 
         return reports
 
 class Guard:
     """Verifies events reported by Watchers."""
-    def __init__(self, guard_id, known_blockchains: dict[str, SimpleBlockchain], is_malicious=False):
-        self.guard_id = guard_id
-        self.known_blockchains = known_blockchains
+    __slots__ = ("guard_id", "is_malicious", "type")
+
+    def __init__(self, guard_id, is_malicious=False):
+        self.guard_id = sys.intern(guard_id)
         self.is_malicious = is_malicious
         self.type = "Malicious" if is_malicious else "Honest"
         # print(f"  Guard {self.guard_id} ({self.type}) initialized.")
 
-    def verify_event(self, reported_event: ReportedEvent):
+    def verify_event(self, reported_event: ReportedEvent, is_actually_valid: bool, coin: float):
         """
-        Checks if the reported event actually exists and is valid on the source chain.
+        Returns this guard's verdict on a reported event.
+        is_actually_valid says whether it matches its source chain; coin is a random byte scaled to [0, 1), i.e. a multiple of 1/256.
         Malicious guards might lie about verification (approve fake, deny real).
         """
-        source_chain = self.known_blockchains.get(reported_event.source_chain_id)
-        if not source_chain:
-            # print(f"  Guard {self.guard_id}: Unknown source chain {reported_event.source_chain_id} for event {reported_event.event_id[:8]}. Cannot verify.")
-            return False # Cannot verify if chain is unknown
-
-        actual_event = source_chain.get_event(reported_event.event_id)
-        is_actually_valid = actual_event and actual_event.data == reported_event.data
-
         # --- Honest Behavior ---
         if not self.is_malicious:
-            # print(f"  Guard {self.guard_id} (Honest): Verified event {reported_event.event_id[:8]} -> {is_actually_valid}")
+            # print(f"  Guard {self.guard_id} (Honest): Verified event {reported_event.event_id} -> {is_actually_valid}")
             return is_actually_valid
 
         # --- Malicious Behavior (Ex: Collusion/Disruption) ---
         else:
-            is_fabricated = reported_event.event_id.startswith("fake-")
+            is_fabricated = reported_event.event_id < 0
 
             if is_fabricated:
-                 # print(f"  Guard {self.guard_id} (Malicious): Falsely verifying fabricated event {reported_event.event_id[:8]} as VALID.")
+                 # print(f"  Guard {self.guard_id} (Malicious): Falsely verifying fabricated event {reported_event.event_id} as VALID.")
                  return True
             else:
-                 if random.random() < 0.5: # 50% chance to deny a real event
-                      # print(f"  Guard {self.guard_id} (Malicious): Falsely verifying real event {reported_event.event_id[:8]} as INVALID.")
+                 if coin < 0.5: # 50% chance to deny a real event
+                      # print(f"  Guard {self.guard_id} (Malicious): Falsely verifying real event {reported_event.event_id} as INVALID.")
                       return False
                  else:
-                     # print(f"  Guard {self.guard_id} (Malicious): Behaving honestly for real event {reported_event.event_id[:8]}. Result: {is_actually_valid}")
+                     # print(f"  Guard {self.guard_id} (Malicious): Behaving honestly for real event {reported_event.event_id}. Result: {is_actually_valid}")
                      return is_actually_valid
\ No newline at end of file